@@ -1,7 +1,7 @@
 """Example usage of Tmeshard ID Generator."""
 import os
 import time
-from timeshard import TimeshardGenerator
+from timeshard import TimeshardGenerator, refresh_config
 
 
 def example_basic_usage():
@@ -20,8 +20,8 @@ def example_basic_usage():
         id_value = generator.next_id()
         parsed = generator.parse_id(id_value)
         print(f"  ID: {id_value}")
-        print(f"    └─ Generated: {parsed['datetime']}")
-        print(f"    └─ Node: {parsed['node_id']}, Sequence: {parsed['sequence']}")
+        print(f"    └─ Generated: {parsed.datetime}")
+        print(f"    └─ Node: {parsed.node_id}, Sequence: {parsed.sequence}")
         print()
 
 
@@ -39,7 +39,7 @@ def example_with_explicit_node_id():
     parsed = generator.parse_id(id_value)
 
     print(f"Generated ID: {id_value}")
-    print(f"Node ID: {parsed['node_id']}")
+    print(f"Node ID: {parsed.node_id}")
     print()
 
 
@@ -78,6 +78,7 @@ def example_environment_configuration():
     # Simulate environment variables
     os.environ['TIMESHARD_NODE_ID_BITS'] = '12'
     os.environ['TIMESHARD_NODE_ID'] = '500'
+    refresh_config()
 
     generator = TimeshardGenerator()
 
@@ -91,6 +92,7 @@ def example_environment_configuration():
     # Clean up
     del os.environ['TIMESHARD_NODE_ID_BITS']
     del os.environ['TIMESHARD_NODE_ID']
+    refresh_config()
 
 
 def example_singleton_pattern():
@@ -125,10 +127,10 @@ def example_parsing_ids():
 
     print(f"ID: {id_value}\n")
     print("Parsed Components:")
-    print(f"  Timestamp: {parsed['timestamp']} ms")
-    print(f"  Datetime: {parsed['datetime']}")
-    print(f"  Node ID: {parsed['node_id']}")
-    print(f"  Sequence: {parsed['sequence']}")
+    print(f"  Timestamp: {parsed.timestamp} ms")
+    print(f"  Datetime: {parsed.datetime}")
+    print(f"  Node ID: {parsed.node_id}")
+    print(f"  Sequence: {parsed.sequence}")
     print()
 
 
@@ -153,7 +155,7 @@ def example_high_throughput():
 
     # Check distribution across milliseconds
     parsed_ids = [generator.parse_id(id_val) for id_val in ids[:1000]]
-    unique_timestamps = len(set(p['timestamp_offset'] for p in parsed_ids))
+    unique_timestamps = len(set(p.timestamp_offset for p in parsed_ids))
 
     print(f"\nFirst 1000 IDs spread across {unique_timestamps} milliseconds")
     print(f"Avg IDs per millisecond: {1000 / unique_timestamps:.0f}")
@@ -186,6 +188,7 @@ def example_deployment_scenarios():
 
     for scenario in scenarios:
         os.environ['TIMESHARD_NODE_ID_BITS'] = str(scenario['node_bits'])
+        refresh_config()
         generator = TimeshardGenerator(node_id=scenario['node_id'])
 
         print(f"\n{scenario['name']}:")
@@ -196,6 +199,7 @@ def example_deployment_scenarios():
         print(f"  Global throughput: {(generator.max_node_id + 1) * (generator.max_sequence + 1):,} IDs/ms")
 
         del os.environ['TIMESHARD_NODE_ID_BITS']
+        refresh_config()
 
     print()
 
@@ -1,10 +1,18 @@
 """Tests for Timeshard ID generator."""
+import base64
 import os
 import threading
 import time
+import weakref
 import pytest
 
-from timeshard.generator import TimeshardGenerator
+from timeshard.generator import TimeshardGenerator, refresh_config
+
+
+@pytest.fixture(autouse=True)
+def fresh_config():
+    """Re-read environment configuration so each test starts from a clean snapshot."""
+    refresh_config()
 
 
 class TestTimeshardGenerator:
@@ -29,10 +37,10 @@ class TestTimeshardGenerator:
         lock = threading.Lock()
 
         def generate_ids(count):
-            for _ in range(count):
-                id_val = generator.next_id()
-                with lock:
-                    ids.append(id_val)
+            # Collect locally so the test lock isn't contended on every ID
+            thread_ids = [generator.next_id() for _ in range(count)]
+            with lock:
+                ids.extend(thread_ids)
 
         threads = [
             threading.Thread(target=generate_ids, args=(1000,))
@@ -47,6 +55,76 @@ class TestTimeshardGenerator:
         assert len(ids) == 10000
         assert len(set(ids)) == 10000, "All IDs across threads should be unique"
 
+    def test_thread_slots(self):
+        """Test threads get separate slots and still produce unique IDs."""
+        generator = TimeshardGenerator(node_id=3, thread_slot_bits=2)
+        ids = []
+        lock = threading.Lock()
+
+        def generate_ids(count):
+            thread_ids = [generator.next_id() for _ in range(count)]
+            with lock:
+                ids.extend(thread_ids)
+
+        # More threads than slots, so some slots are shared
+        threads = [
+            threading.Thread(target=generate_ids, args=(1000,))
+            for _ in range(6)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(ids)) == 6000, "All IDs across slots should be unique"
+
+        parsed = generator.parse_ids(ids)
+        assert set(parsed['node_id']) == {3}
+        assert set(parsed['thread_slot']) == {0, 1, 2, 3}
+
+    def test_thread_slots_reduce_node_range(self):
+        """Test that thread slot bits are taken from the node ID range."""
+        generator = TimeshardGenerator(node_id=63, thread_slot_bits=4)
+        assert generator.max_node_id == 63
+
+        with pytest.raises(ValueError, match="Node ID must be between"):
+            TimeshardGenerator(node_id=64, thread_slot_bits=4)
+
+        with pytest.raises(ValueError, match="Thread slot bits must be between"):
+            TimeshardGenerator(node_id=1, thread_slot_bits=10)
+
+    def test_next_ids_batch(self):
+        """Test batch generation produces unique, increasing IDs."""
+        generator = TimeshardGenerator(node_id=1)
+
+        # More than one millisecond's worth of sequence numbers
+        ids = generator.next_ids(10000)
+
+        assert len(ids) == 10000
+        assert len(set(ids)) == 10000, "All batch IDs should be unique"
+        assert ids == sorted(ids), "Batch IDs should be increasing"
+        assert all(generator.parse_id(i).node_id == 1 for i in ids[:100])
+
+    def test_next_ids_interleaved_with_next_id(self):
+        """Test batch and single generation share the same sequence state."""
+        generator = TimeshardGenerator(node_id=1)
+
+        ids = [generator.next_id()]
+        ids += generator.next_ids(500)
+        ids.append(generator.next_id())
+
+        assert len(set(ids)) == 502
+        assert ids == sorted(ids)
+
+    def test_next_ids_invalid_count(self):
+        """Test that a negative batch size raises error."""
+        generator = TimeshardGenerator(node_id=1)
+
+        assert generator.next_ids(0) == []
+        with pytest.raises(ValueError, match="non-negative"):
+            generator.next_ids(-1)
+
     def test_parse_id(self):
         """Test parsing ID back into components."""
         generator = TimeshardGenerator(node_id=42)
@@ -54,10 +132,49 @@ class TestTimeshardGenerator:
 
         parsed = generator.parse_id(id_value)
 
-        assert parsed['node_id'] == 42
-        assert parsed['sequence'] >= 0
-        assert parsed['timestamp'] > generator.custom_epoch
-        assert 'datetime' in parsed
+        assert parsed.id == id_value
+        assert parsed.node_id == 42
+        assert parsed.sequence >= 0
+        assert parsed.timestamp > generator.custom_epoch
+        assert parsed.datetime
+
+    def test_parse_id_datetime(self):
+        """Test lazily formatted datetime keeps millisecond precision."""
+        generator = TimeshardGenerator(node_id=1, custom_epoch=1700000000000)
+        id_value = (123 << (generator.node_id_bits + generator.sequence_bits)) | 5
+
+        parsed = generator.parse_id(id_value)
+
+        assert parsed.datetime == '2023-11-14 22:13:20.123'
+        assert parsed.timestamp_offset == 123
+        assert parsed.sequence == 5
+
+    def test_parse_id_is_a_named_tuple(self):
+        """Test parsed IDs are read by attribute, not by string key."""
+        generator = TimeshardGenerator(node_id=9)
+        id_value = generator.next_id()
+        parsed = generator.parse_id(id_value)
+
+        assert parsed.node_id == 9
+        assert parsed[0] == id_value
+        assert parsed._asdict()['node_id'] == 9
+
+        # Former dict-style access fails loudly instead of returning wrong data
+        with pytest.raises(TypeError):
+            parsed['node_id']
+
+    def test_parse_ids_matches_parse_id(self):
+        """Test batch parsing agrees with single-ID parsing."""
+        generator = TimeshardGenerator(node_id=42)
+        ids = generator.next_ids(5000)
+
+        parsed = generator.parse_ids(ids)
+
+        assert parsed['id'] == ids
+        for i in (0, 1, 4095, 4096, 4999):
+            single = generator.parse_id(ids[i])
+            for field in ('timestamp', 'timestamp_offset', 'node_id', 'sequence'):
+                assert parsed[field][i] == getattr(single, field)
 
     def test_multiple_ids_same_millisecond(self):
         """Test generating multiple IDs in same millisecond."""
@@ -70,7 +187,7 @@ class TestTimeshardGenerator:
         parsed_ids = [generator.parse_id(id_val) for id_val in ids]
 
         # Should have some with same timestamp but different sequences
-        timestamps = [p['timestamp_offset'] for p in parsed_ids]
+        timestamps = [p.timestamp_offset for p in parsed_ids]
         assert len(set(timestamps)) < len(timestamps), "Should have multiple IDs per millisecond"
 
     def test_different_nodes_different_ids(self):
@@ -86,8 +203,8 @@ class TestTimeshardGenerator:
         parsed1 = gen1.parse_id(id1)
         parsed2 = gen2.parse_id(id2)
 
-        assert parsed1['node_id'] == 1
-        assert parsed2['node_id'] == 2
+        assert parsed1.node_id == 1
+        assert parsed2.node_id == 2
 
     def test_invalid_node_id(self):
         """Test that invalid node ID raises error."""
@@ -108,6 +225,20 @@ class TestTimeshardGenerator:
         numeric_part = id_with_prefix[3:]
         assert numeric_part.isdigit()
 
+    def test_b32_id(self):
+        """Test base32 ID encodes the generated ID."""
+        generator = TimeshardGenerator(node_id=7)
+
+        b32_id = generator.next_id_b32("TXN")
+        assert b32_id.startswith("TXN")
+
+        encoded = b32_id[3:]
+        assert len(encoded) == 13
+
+        # Round-trip back to the integer ID
+        id_value = int.from_bytes(base64.b32decode(encoded + "==="), 'big')
+        assert generator.parse_id(id_value).node_id == 7
+
     def test_prefix_at_position(self):
         """Test prefix insertion at specific position."""
         generator = TimeshardGenerator(node_id=1)
@@ -130,6 +261,35 @@ class TestTimeshardGenerator:
         assert instance1 is instance2
         assert instance1.node_id == 5  # First call's node_id is used
 
+    def test_supports_weakref(self):
+        """Test generators can be weakly referenced despite __slots__."""
+        generator = TimeshardGenerator(node_id=1)
+        assert weakref.ref(generator)() is generator
+
+    def test_singleton_per_subclass(self):
+        """Test subclasses get their own singleton instance."""
+        class CustomGenerator(TimeshardGenerator):
+            __slots__ = ()
+
+        base = TimeshardGenerator.get_instance(node_id=5)
+        custom = CustomGenerator.get_instance(node_id=6)
+
+        assert type(custom) is CustomGenerator
+        assert custom is not base
+        assert CustomGenerator.get_instance() is custom
+        assert TimeshardGenerator.get_instance() is base
+
+        # Subclass keeping the original __init__ signature
+        class LegacyGenerator(TimeshardGenerator):
+            __slots__ = ()
+
+            def __init__(self, node_id=None, custom_epoch=None):
+                super().__init__(node_id=node_id, custom_epoch=custom_epoch)
+
+        legacy = LegacyGenerator.get_instance(node_id=3)
+        assert type(legacy) is LegacyGenerator
+        assert legacy.node_id == 3
+
     def test_config_info(self):
         """Test configuration info string."""
         generator = TimeshardGenerator(node_id=1)
@@ -146,12 +306,14 @@ class TestEnvironmentConfiguration:
     def test_node_id_from_env(self, monkeypatch):
         """Test reading node ID from environment."""
         monkeypatch.setenv('TIMESHARD_NODE_ID', '123')
+        refresh_config()
         generator = TimeshardGenerator()
         assert generator.node_id == 123
 
     def test_node_id_bits_from_env(self, monkeypatch):
         """Test configuring node ID bits from environment."""
         monkeypatch.setenv('TIMESHARD_NODE_ID_BITS', '12')
+        refresh_config()
         generator = TimeshardGenerator(node_id=1)
 
         assert generator.node_id_bits == 12
@@ -162,13 +324,67 @@ class TestEnvironmentConfiguration:
         """Test custom epoch from environment."""
         custom_epoch = 1700000000000
         monkeypatch.setenv('TIMESHARD_CUSTOM_EPOCH', str(custom_epoch))
+        refresh_config()
 
         generator = TimeshardGenerator(node_id=1)
         assert generator.custom_epoch == custom_epoch
 
+    def test_thread_slot_bits_from_env(self, monkeypatch):
+        """Test configuring thread slot bits from environment."""
+        monkeypatch.setenv('TIMESHARD_THREAD_SLOT_BITS', '3')
+        refresh_config()
+        generator = TimeshardGenerator(node_id=1)
+
+        assert generator.thread_slot_bits == 3
+        assert generator.max_node_id == 127  # 2^(10 - 3) - 1
+        assert generator.parse_id(generator.next_id()).node_id == 1
+
+    def test_invalid_env_ignored_when_overridden(self, monkeypatch):
+        """Test that invalid env values only raise when they are actually used."""
+        monkeypatch.setenv('TIMESHARD_NODE_ID', 'invalid')
+        monkeypatch.setenv('TIMESHARD_CUSTOM_EPOCH', 'invalid')
+        refresh_config()
+
+        generator = TimeshardGenerator(node_id=1, custom_epoch=1700000000000)
+        assert generator.node_id == 1
+        assert generator.custom_epoch == 1700000000000
+
+        with pytest.raises(RuntimeError, match="TIMESHARD_CUSTOM_EPOCH must be an integer"):
+            TimeshardGenerator(node_id=1)
+
+    def test_invalid_thread_slot_bits_from_env(self, monkeypatch):
+        """Test that THREAD_SLOT_BITS not below NODE_ID_BITS raises error."""
+        monkeypatch.setenv('TIMESHARD_THREAD_SLOT_BITS', '12')
+        refresh_config()
+
+        with pytest.raises(RuntimeError, match="must be < TIMESHARD_NODE_ID_BITS"):
+            TimeshardGenerator(node_id=1)
+
+        # An explicit argument overrides the invalid environment value
+        assert TimeshardGenerator(node_id=1, thread_slot_bits=2).thread_slot_bits == 2
+
+    def test_config_is_cached(self, monkeypatch):
+        """Test that environment changes apply only after refresh_config()."""
+        assert TimeshardGenerator(node_id=1).node_id_bits == 10
+
+        monkeypatch.setenv('TIMESHARD_NODE_ID_BITS', '12')
+        assert TimeshardGenerator(node_id=1).node_id_bits == 10
+
+        refresh_config()
+        assert TimeshardGenerator(node_id=1).node_id_bits == 12
+
+    def test_zero_custom_epoch_from_env(self, monkeypatch):
+        """Test that a zero epoch from environment is used, not the default."""
+        monkeypatch.setenv('TIMESHARD_CUSTOM_EPOCH', '0')
+        refresh_config()
+
+        generator = TimeshardGenerator(node_id=1)
+        assert generator.custom_epoch == 0
+
     def test_invalid_node_id_bits(self, monkeypatch):
         """Test that invalid NODE_ID_BITS raises error."""
         monkeypatch.setenv('TIMESHARD_NODE_ID_BITS', '20')  # Too large
+        refresh_config()
 
         with pytest.raises(RuntimeError, match="must be <= 16"):
             TimeshardGenerator(node_id=1)
@@ -176,6 +392,7 @@ class TestEnvironmentConfiguration:
     def test_invalid_env_values(self, monkeypatch):
         """Test that non-numeric env values raise errors."""
         monkeypatch.setenv('TIMESHARD_NODE_ID', 'invalid')
+        refresh_config()
 
         with pytest.raises(RuntimeError, match="must be an integer"):
             TimeshardGenerator()
@@ -199,10 +416,30 @@ class TestAutoNodeIdGeneration:
         # Both should generate same node ID on same machine
         assert gen1.node_id == gen2.node_id
 
+    def test_node_id_from_pod_ip(self, monkeypatch):
+        """Test that POD_IP is used instead of resolving the hostname."""
+        monkeypatch.setenv('POD_IP', '10.0.1.42')
+        refresh_config()
+
+        generator = TimeshardGenerator()
+        assert generator.node_id == 298  # (1 << 8) | 42
+
 
 class TestEdgeCases:
     """Tests for edge cases and error conditions."""
 
+    def test_clock_moved_backwards(self):
+        """Test that a clock moving backwards raises error."""
+        generator = TimeshardGenerator(node_id=1)
+        generator.next_id()
+
+        # Rewind the generator's clock by one second
+        real_time_ns = generator._time_ns
+        generator._time_ns = lambda: real_time_ns() - 1_000_000_000
+
+        with pytest.raises(RuntimeError, match="Clock moved backwards"):
+            generator.next_id()
+
     def test_sequence_exhaustion(self):
         """Test behavior when sequence is exhausted in one millisecond."""
         generator = TimeshardGenerator(node_id=1)
@@ -214,6 +451,26 @@ class TestEdgeCases:
 
         assert len(set(ids)) == 5000, "All IDs should still be unique"
 
+    def test_sequence_exhaustion_waits_for_next_millisecond(self):
+        """Test next_id() waits out an exhausted sequence before reusing it."""
+        generator = TimeshardGenerator(node_id=1)
+
+        # Fake clock pinned to the start of one millisecond for two reads (the
+        # hot path and the first check in _wait_next_millis), then one ms later
+        start_ns = (generator._timestamp() + generator.custom_epoch) * 1_000_000
+        readings = iter([start_ns, start_ns])
+        generator._time_ns = lambda: next(readings, start_ns + 1_000_000)
+
+        # Sequence already at its maximum for the current millisecond
+        ts = start_ns // 1_000_000 - generator.custom_epoch
+        generator._slots[0].state = (ts << generator.sequence_bits) | generator.max_sequence
+
+        parsed = generator.parse_id(generator.next_id())
+
+        assert parsed.timestamp_offset == ts + 1
+        assert parsed.sequence == 0
+        assert next(readings, None) is None, "Wait loop should have re-read the clock"
+
     def test_high_throughput(self):
         """Test sustained high-throughput generation."""
         generator = TimeshardGenerator(node_id=1)
@@ -1,3 +1,3 @@
-from .generator import TimeshardGenerator
+from .generator import ParsedID, TimeshardGenerator, refresh_config
 
-__all__ = ["TimeshardGenerator"]
\ No newline at end of file
+__all__ = ["ParsedID", "TimeshardGenerator", "refresh_config"]
\ No newline at end of file
@@ -4,11 +4,242 @@ Distributed  ID Generator.
 Inspired by Twitter Snowflake implementation.
 This should be used as a singleton - create one instance per process/node.
 """
+import functools
+import itertools
 import os
 import socket
 import threading
 import time
-from typing import Dict, Optional
+import warnings
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# RFC 4648 base32 alphabet and all two-character pairs, for next_id_b32()
+_B32_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+_B32_PAIRS = [a + b for a in _B32_ALPHABET for b in _B32_ALPHABET]
+
+# Process-wide singletons keyed by class, see TimeshardGenerator.get_instance()
+_INSTANCES: Dict[type, "TimeshardGenerator"] = {}
+_INIT_LOCK = threading.Lock()
+
+
+def _format_timestamp(timestamp_ms: int) -> str:
+    """Format absolute millisecond timestamp as 'YYYY-MM-DD HH:MM:SS.mmm' (UTC)."""
+    seconds, millis = divmod(timestamp_ms, 1000)
+    return f"{time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(seconds))}.{millis:03d}"
+
+
+class ParsedID(NamedTuple):
+    """
+    Components of a parsed ID, as returned by parse_id().
+
+    A tuple rather than a dict: smaller, not hash-table backed, and fields are
+    read by attribute (parsed.node_id). Use _asdict() where a mapping is needed.
+    """
+    id: int
+    timestamp: int
+    timestamp_offset: int
+    node_id: int
+    thread_slot: int
+    sequence: int
+
+    @property
+    def datetime(self) -> str:
+        """Human-readable UTC timestamp, formatted on access."""
+        return _format_timestamp(self.timestamp)
+
+
+@dataclass(frozen=True)
+class _Config:
+    """
+    Snapshot of the TIMESHARD_* environment configuration.
+
+    A variable that failed to parse is stored as None with its error message in
+    errors; get() raises it only when a generator actually falls back to it.
+    """
+    node_id_bits: Optional[int]
+    custom_epoch: Optional[int]
+    node_id: Optional[int]
+    thread_slot_bits: Optional[int]
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def get(self, name: str):
+        """
+        Get a configuration value.
+
+        Raises:
+            RuntimeError: If the environment variable backing it is invalid
+        """
+        error = self.errors.get(name)
+        if error is not None:
+            raise RuntimeError(error)
+        return getattr(self, name)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_config() -> _Config:
+    """
+    Read configuration from the environment.
+
+    Parsed once and cached; call refresh_config() after changing the environment.
+    Invalid values are recorded rather than raised, see _Config.get().
+    """
+    errors = {}
+
+    def parse(name, getter):
+        try:
+            return getter()
+        except RuntimeError as e:
+            errors[name] = str(e)
+            return None
+
+    node_id_bits = parse('node_id_bits', _get_node_id_bits_from_env)
+
+    return _Config(
+        node_id_bits=node_id_bits,
+        custom_epoch=parse('custom_epoch', _get_custom_epoch_from_env),
+        node_id=parse('node_id', _get_node_id_from_env),
+        thread_slot_bits=parse(
+            'thread_slot_bits', lambda: _get_thread_slot_bits_from_env(node_id_bits)
+        ),
+        errors=errors,
+    )
+
+
+def refresh_config() -> None:
+    """Discard the cached environment configuration so it is re-read on next use."""
+    _load_config.cache_clear()
+    _detect_node_id_from_ip.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_node_id_from_ip() -> int:
+    """
+    Derive a node ID from the machine's IP address.
+
+    Uses last 2 octets of IP address to generate a semi-unique node ID.
+    This works well in Kubernetes/Docker environments where each pod gets a unique IP.
+    POD_IP (Kubernetes downward API) is preferred when set, so no DNS lookup is needed;
+    otherwise the hostname is resolved. Cached, since resolution can block on DNS.
+
+    Returns:
+        16-bit value from the IP address, to be masked to node_id_bits by the caller
+    """
+    pod_ip = os.getenv('POD_IP')
+    if pod_ip:
+        try:
+            return _ip_to_node_bits(pod_ip)
+        except ValueError:
+            pass  # Not IPv4, fall back to hostname resolution
+
+    try:
+        hostname = socket.gethostname()
+        ip_address = socket.gethostbyname(hostname)
+        return _ip_to_node_bits(ip_address)
+    except Exception as e:
+        # Fallback to 0 if IP detection fails
+        warnings.warn(
+            f"Failed to auto-generate node ID from IP: {e}. Using node_id=0. "
+            f"Consider setting TIMESHARD_NODE_ID environment variable.",
+            RuntimeWarning
+        )
+        return 0
+
+
+def _ip_to_node_bits(ip_address: str) -> int:
+    """Combine last 2 octets of an IPv4 address: 192.168.1.42 -> (1 << 8) | 42 = 298."""
+    octets = [int(x) for x in ip_address.split('.')]
+    if len(octets) != 4:
+        raise ValueError(f"Not an IPv4 address: '{ip_address}'")
+    return (octets[2] << 8) | octets[3]
+
+
+def _get_node_id_bits_from_env() -> int:
+    """Get NODE_ID_BITS from environment variable."""
+    try:
+        node_id_bits = int(os.getenv('TIMESHARD_NODE_ID_BITS', '10'))
+    except ValueError:
+        raise RuntimeError(
+            "TIMESHARD_NODE_ID_BITS environment variable must be an integer"
+        )
+
+    if node_id_bits > 16:
+        raise RuntimeError(
+            f"TIMESHARD_NODE_ID_BITS must be <= 16, got {node_id_bits}"
+        )
+
+    if node_id_bits < 1:
+        raise RuntimeError(
+            f"TIMESHARD_NODE_ID_BITS must be >= 1, got {node_id_bits}"
+        )
+
+    return node_id_bits
+
+
+def _get_node_id_from_env() -> Optional[int]:
+    """Get explicit node ID from environment variable."""
+    node_id_str = os.getenv('TIMESHARD_NODE_ID')
+    if node_id_str is None:
+        return None
+
+    try:
+        return int(node_id_str)
+    except ValueError:
+        raise RuntimeError(
+            f"TIMESHARD_NODE_ID environment variable must be an integer, got '{node_id_str}'"
+        )
+
+
+def _get_thread_slot_bits_from_env(node_id_bits: Optional[int]) -> int:
+    """Get THREAD_SLOT_BITS from environment variable, bounded by NODE_ID_BITS."""
+    try:
+        thread_slot_bits = int(os.getenv('TIMESHARD_THREAD_SLOT_BITS', '0'))
+    except ValueError:
+        raise RuntimeError(
+            "TIMESHARD_THREAD_SLOT_BITS environment variable must be an integer"
+        )
+
+    if thread_slot_bits < 0:
+        raise RuntimeError(
+            f"TIMESHARD_THREAD_SLOT_BITS must be >= 0, got {thread_slot_bits}"
+        )
+
+    # Unknown if NODE_ID_BITS itself is invalid; that error is raised first anyway
+    if node_id_bits is not None and thread_slot_bits >= node_id_bits:
+        raise RuntimeError(
+            f"TIMESHARD_THREAD_SLOT_BITS must be < TIMESHARD_NODE_ID_BITS ({node_id_bits}), "
+            f"got {thread_slot_bits}"
+        )
+
+    return thread_slot_bits
+
+
+def _get_custom_epoch_from_env() -> int:
+    """Get custom epoch from environment variable."""
+    epoch_str = os.getenv('TIMESHARD_CUSTOM_EPOCH')
+    if epoch_str is None:
+        return TimeshardGenerator.DEFAULT_CUSTOM_EPOCH
+
+    try:
+        return int(epoch_str)
+    except ValueError:
+        raise RuntimeError(
+            f"TIMESHARD_CUSTOM_EPOCH must be an integer, got '{epoch_str}'"
+        )
+
+
+class _Slot:
+    """Generation state for one thread slot, each with its own lock."""
+
+    __slots__ = ('state', 'lock', 'node_shifted')
+
+    def __init__(self, node_shifted: int, sequence_bits: int):
+        # Packed as (last_timestamp << sequence_bits) | sequence so a single
+        # read/write captures both halves
+        self.state = -1 << sequence_bits
+        self.lock = threading.Lock()
+        self.node_shifted = node_shifted
 
 
 class TimeshardGenerator:
@@ -21,10 +252,19 @@ class TimeshardGenerator:
     - configurable bits: node/worker ID (from environment, default 10)
     - remaining bits: sequence number
 
+    Thread Slots:
+        Optionally the low thread_slot_bits of the node field are reserved for a
+        per-thread slot. Each thread is assigned a slot on first use and slots
+        keep separate sequence state, so threads on different slots never
+        contend on the same lock. Costs 2^thread_slot_bits fewer nodes.
+
     Environment Variables:
         TIMESHARD_NODE_ID_BITS: Number of bits for node ID (default: 10, max: 16)
         TIMESHARD_NODE_ID: Override auto-generated node ID
         TIMESHARD_CUSTOM_EPOCH: Custom epoch in milliseconds (default: 2023-12-12)
+        TIMESHARD_THREAD_SLOT_BITS: Node bits reserved for thread slots (default: 0)
+
+        Read once and cached; call refresh_config() after changing them at runtime.
 
     Example:
         # Auto-configure from environment
@@ -43,40 +283,64 @@ class TimeshardGenerator:
     EPOCH_BITS = 41
     DEFAULT_CUSTOM_EPOCH = 1702385533000  # 2023-12-12 00:00:00 UTC
 
-    # Singleton instance
-    _instance = None
-    _lock = threading.Lock()
-
-    def __init__(self, node_id: Optional[int] = None, custom_epoch: Optional[int] = None):
+    # Fixed attribute layout: slot descriptors instead of a per-instance __dict__
+    __slots__ = (
+        'node_id_bits', 'sequence_bits', 'max_node_id', 'max_sequence',
+        'custom_epoch', 'node_id', 'thread_slot_bits', '_ts_shift', '_node_mask',
+        '_slot_mask', '_time_ns', '_slots', '_slot_counter', '_local',
+        '__weakref__',
+    )
+
+    def __init__(
+            self,
+            node_id: Optional[int] = None,
+            custom_epoch: Optional[int] = None,
+            thread_slot_bits: Optional[int] = None,
+    ):
         """
         Initialize ID generator.
 
         Args:
             node_id: Node/worker ID. If None, auto-generated from IP or ENV
             custom_epoch: Custom epoch in milliseconds. If None, uses default or ENV
+            thread_slot_bits: Node bits reserved for per-thread slots. If None, uses ENV (default 0)
 
         Raises:
-            ValueError: If node_id is out of valid range
-            RuntimeError: If NODE_ID_BITS configuration is invalid
+            ValueError: If node_id or thread_slot_bits is out of valid range
+            RuntimeError: If an environment variable this generator falls back to is invalid
         """
+        # Environment configuration (parsed once, cached)
+        config = _load_config()
+
         # Get NODE_ID_BITS from environment
-        self.node_id_bits = self._get_node_id_bits_from_env()
+        self.node_id_bits = config.get('node_id_bits')
 
         # Calculate sequence bits
         self.sequence_bits = 64 - self.EPOCH_BITS - self.node_id_bits - self.UNUSED_BITS
 
+        # Thread slots take the low bits of the node field
+        if thread_slot_bits is None:
+            thread_slot_bits = config.get('thread_slot_bits')
+        if not 0 <= thread_slot_bits < self.node_id_bits:
+            raise ValueError(
+                f"Thread slot bits must be between 0 and {self.node_id_bits - 1}, "
+                f"got {thread_slot_bits}"
+            )
+        self.thread_slot_bits = thread_slot_bits
+
         # Calculate max values
-        self.max_node_id = (1 << self.node_id_bits) - 1
+        self.max_node_id = (1 << (self.node_id_bits - self.thread_slot_bits)) - 1
         self.max_sequence = (1 << self.sequence_bits) - 1
 
         # Get custom epoch
-        self.custom_epoch = custom_epoch or self._get_custom_epoch_from_env()
+        self.custom_epoch = custom_epoch or config.get('custom_epoch')
 
         # Get or generate node ID
         if node_id is not None:
             self.node_id = node_id
         else:
-            self.node_id = self._get_node_id_from_env() or self._generate_node_id()
+            # Mask to the node ID bits left after the thread slot bits (max_node_id)
+            self.node_id = config.get('node_id') or (_detect_node_id_from_ip() & self.max_node_id)
 
         # Validate node ID
         if not 0 <= self.node_id <= self.max_node_id:
@@ -84,28 +348,58 @@ class TimeshardGenerator:
                 f"Node ID must be between 0 and {self.max_node_id}, got {self.node_id}"
             )
 
-        # State for ID generation
-        self._last_timestamp = -1
-        self._sequence = 0
-        self._gen_lock = threading.Lock()
+        # Precomputed constants for the next_id() hot path and parsing
+        self._ts_shift = self.node_id_bits + self.sequence_bits
+        self._node_mask = (1 << self.node_id_bits) - 1
+        self._slot_mask = (1 << self.thread_slot_bits) - 1
+        self._time_ns = time.time_ns
+
+        # State for ID generation, one slot per thread-slot value
+        node_field = self.node_id << self.thread_slot_bits
+        self._slots = [
+            _Slot((node_field | slot) << self.sequence_bits, self.sequence_bits)
+            for slot in range(1 << self.thread_slot_bits)
+        ]
+        self._slot_counter = itertools.count()
+
+        # Without thread slots every thread shares slot 0, so a plain namespace
+        # stands in for threading.local and the hot path needs no extra branch
+        if self.thread_slot_bits:
+            self._local = threading.local()
+        else:
+            self._local = SimpleNamespace(slot=self._slots[0])
 
     @classmethod
-    def get_instance(cls, node_id: Optional[int] = None, custom_epoch: Optional[int] = None):
+    def get_instance(
+            cls,
+            node_id: Optional[int] = None,
+            custom_epoch: Optional[int] = None,
+            thread_slot_bits: Optional[int] = None,
+    ):
         """
-        Get singleton instance (thread-safe).
+        Get singleton instance (thread-safe), one per class.
 
         Args:
             node_id: Node ID (only used on first call)
             custom_epoch: Custom epoch (only used on first call)
+            thread_slot_bits: Thread slot bits (only used on first call)
 
         Returns:
             Singleton TimeshardGenerator instance
         """
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = cls(node_id=node_id, custom_epoch=custom_epoch)
-        return cls._instance
+        # Fast path: a plain dict lookup, no lock once initialized
+        instance = _INSTANCES.get(cls)
+        if instance is None:
+            with _INIT_LOCK:
+                instance = _INSTANCES.get(cls)
+                if instance is None:
+                    kwargs = {'node_id': node_id, 'custom_epoch': custom_epoch}
+                    # Only pass when given, so subclasses with the older
+                    # (node_id, custom_epoch) __init__ signature keep working
+                    if thread_slot_bits is not None:
+                        kwargs['thread_slot_bits'] = thread_slot_bits
+                    instance = _INSTANCES[cls] = cls(**kwargs)
+        return instance
 
     def next_id(self) -> int:
         """
@@ -117,38 +411,122 @@ class TimeshardGenerator:
         Raises:
             RuntimeError: If system clock moves backwards
         """
-        with self._gen_lock:
-            current_timestamp = self._timestamp()
+        # Copy hot-path attributes to locals to skip repeated attribute lookups
+        time_ns = self._time_ns
+        epoch = self.custom_epoch
+        max_sequence = self.max_sequence
+        sequence_bits = self.sequence_bits
 
-            # Check for clock moving backwards
-            if current_timestamp < self._last_timestamp:
+        try:
+            slot = self._local.slot
+        except AttributeError:
+            slot = self._assign_slot()
+
+        with slot.lock:
+            state = slot.state
+            last_timestamp = state >> sequence_bits
+            current_timestamp = time_ns() // 1_000_000 - epoch
+
+            # Branches ordered by frequency: under load most calls land in the
+            # same millisecond, so that case is decided by a single comparison
+            if current_timestamp == last_timestamp:
+                # Same millisecond - bump the sequence held in the low bits of the state
+                if state & max_sequence != max_sequence:
+                    state += 1
+                else:
+                    # Sequence exhausted - wait for next millisecond
+                    current_timestamp = self._wait_next_millis(current_timestamp)
+                    state = current_timestamp << sequence_bits
+            elif current_timestamp > last_timestamp:
+                # New millisecond - reset sequence
+                state = current_timestamp << sequence_bits
+            else:
+                # Clock moved backwards
                 raise RuntimeError(
                     f"Clock moved backwards. Refusing to generate ID. "
-                    f"Last timestamp: {self._last_timestamp}, Current: {current_timestamp}"
+                    f"Last timestamp: {last_timestamp}, Current: {current_timestamp}"
                 )
 
-            # Same millisecond - increment sequence
-            if current_timestamp == self._last_timestamp:
-                self._sequence = (self._sequence + 1) & self.max_sequence
-
-                # Sequence exhausted - wait for next millisecond
-                if self._sequence == 0:
-                    current_timestamp = self._wait_next_millis(current_timestamp)
-            else:
-                # New millisecond - reset sequence
-                self._sequence = 0
-
-            self._last_timestamp = current_timestamp
+            # Publish the new state in a single store
+            slot.state = state
 
             # Construct ID: timestamp | node_id | sequence
             id_value = (
-                    (current_timestamp << (self.node_id_bits + self.sequence_bits)) |
-                    (self.node_id << self.sequence_bits) |
-                    self._sequence
+                    (current_timestamp << self._ts_shift) |
+                    slot.node_shifted |
+                    (state & max_sequence)
             )
 
             return id_value
 
+    def next_ids(self, count: int) -> List[int]:
+        """
+        Generate a batch of unique IDs.
+
+        Preferred over calling next_id() in a loop for bulk generation: the lock
+        is taken once and the clock is read once per millisecond, and IDs within
+        the same millisecond are consecutive integers.
+
+        Args:
+            count: Number of IDs to generate
+
+        Returns:
+            List of unique, increasing 64-bit integer IDs
+
+        Raises:
+            ValueError: If count is negative
+            RuntimeError: If system clock moves backwards
+        """
+        if count < 0:
+            raise ValueError(f"Count must be non-negative, got {count}")
+
+        max_sequence = self.max_sequence
+        sequence_bits = self.sequence_bits
+        ts_shift = self._ts_shift
+
+        try:
+            slot = self._local.slot
+        except AttributeError:
+            slot = self._assign_slot()
+        node_shifted = slot.node_shifted
+
+        ids = []
+        with slot.lock:
+            state = slot.state
+            remaining = count
+
+            while remaining > 0:
+                last_timestamp = state >> sequence_bits
+                current_timestamp = self._timestamp()
+
+                # Check for clock moving backwards
+                if current_timestamp < last_timestamp:
+                    raise RuntimeError(
+                        f"Clock moved backwards. Refusing to generate ID. "
+                        f"Last timestamp: {last_timestamp}, Current: {current_timestamp}"
+                    )
+
+                # Continue the current millisecond's sequence, or wait if it is used up
+                if current_timestamp == last_timestamp:
+                    start = (state & max_sequence) + 1
+                    if start > max_sequence:
+                        current_timestamp = self._wait_next_millis(current_timestamp)
+                        start = 0
+                else:
+                    start = 0
+
+                # Take as many sequence numbers as this millisecond has left
+                take = min(remaining, max_sequence + 1 - start)
+                first_id = (current_timestamp << ts_shift) | node_shifted | start
+                ids.extend(range(first_id, first_id + take))
+
+                state = (current_timestamp << sequence_bits) | (start + take - 1)
+                remaining -= take
+
+            slot.state = state
+
+        return ids
+
     def next_id_with_prefix(self, prefix: str) -> str:
         """
         Generate ID with string prefix.
@@ -164,6 +542,37 @@ class TimeshardGenerator:
         """
         return f"{prefix}{self.next_id()}"
 
+    def next_id_b32(self, prefix: str = "") -> str:
+        """
+        Generate ID as compact base32 text with optional string prefix.
+
+        Encodes the 8-byte big-endian ID with the RFC 4648 alphabet, padding
+        stripped, giving 13 characters instead of up to 19 decimal digits.
+
+        Args:
+            prefix: String prefix to prepend
+
+        Returns:
+            String like "TXNAU3KHZCVYAIAA"
+
+        Example:
+            generator.next_id_b32("ORD_")  # "ORD_AU3KHZCVYAIAA"
+        """
+        # 64 bits shifted to 65 so they split evenly into 13 5-bit groups,
+        # which matches base64.b32encode(id.to_bytes(8, 'big')).rstrip(b'=')
+        value = self.next_id() << 1
+        pairs = _B32_PAIRS
+        return (
+            prefix +
+            pairs[value >> 55] +
+            pairs[(value >> 45) & 1023] +
+            pairs[(value >> 35) & 1023] +
+            pairs[(value >> 25) & 1023] +
+            pairs[(value >> 15) & 1023] +
+            pairs[(value >> 5) & 1023] +
+            _B32_ALPHABET[value & 31]
+        )
+
     def next_id_with_prefix_at(self, prefix: str, position: int) -> str:
         """
         Generate ID with prefix inserted at specific position.
@@ -190,7 +599,7 @@ class TimeshardGenerator:
 
         return id_str[:position] + prefix + id_str[position:]
 
-    def parse_id(self, id_value: int) -> Dict[str, any]:
+    def parse_id(self, id_value: int) -> ParsedID:
         """
         Parse ID back into components.
 
@@ -198,29 +607,57 @@ class TimeshardGenerator:
             id_value: ID to parse
 
         Returns:
-            Dictionary with timestamp, node_id, sequence, and datetime
+            ParsedID with timestamp, node_id, thread_slot, sequence, and datetime
+            (datetime is formatted on access)
         """
         # Extract sequence
         sequence = id_value & self.max_sequence
 
-        # Extract node_id
-        node_mask = (1 << self.node_id_bits) - 1
-        node_id = (id_value >> self.sequence_bits) & node_mask
+        # Extract node_id and thread slot (low bits of the node field)
+        node_field = (id_value >> self.sequence_bits) & self._node_mask
+        node_id = node_field >> self.thread_slot_bits
+        thread_slot = node_field & self._slot_mask
 
         # Extract timestamp
-        timestamp_offset = id_value >> (self.node_id_bits + self.sequence_bits)
+        timestamp_offset = id_value >> self._ts_shift
         timestamp_ms = timestamp_offset + self.custom_epoch
 
+        # datetime is a property, it costs more than the bit extraction
+        return ParsedID(id_value, timestamp_ms, timestamp_offset, node_id, thread_slot, sequence)
+
+    def parse_ids(self, id_values: Iterable[int]) -> Dict[str, List[int]]:
+        """
+        Parse many IDs at once into per-field lists.
+
+        Column-oriented (one list per component) and without the datetime
+        formatting, so it is much cheaper than calling parse_id() per ID.
+
+        Args:
+            id_values: IDs to parse
+
+        Returns:
+            Dictionary mapping id, timestamp, timestamp_offset, node_id,
+            thread_slot and sequence to lists aligned with the input order
+        """
+        ids = list(id_values)
+        max_sequence = self.max_sequence
+        sequence_bits = self.sequence_bits
+        node_mask = self._node_mask
+        slot_bits = self.thread_slot_bits
+        slot_mask = self._slot_mask
+        ts_shift = self._ts_shift
+        epoch = self.custom_epoch
+
+        offsets = [id_value >> ts_shift for id_value in ids]
+        node_fields = [(id_value >> sequence_bits) & node_mask for id_value in ids]
+
         return {
-            'id': id_value,
-            'timestamp': timestamp_ms,
-            'timestamp_offset': timestamp_offset,
-            'node_id': node_id,
-            'sequence': sequence,
-            'datetime': time.strftime(
-                '%Y-%m-%d %H:%M:%S.%f',
-                time.gmtime(timestamp_ms / 1000)
-            )[:-3]  # Trim to milliseconds
+            'id': ids,
+            'timestamp': [offset + epoch for offset in offsets],
+            'timestamp_offset': offsets,
+            'node_id': [field >> slot_bits for field in node_fields],
+            'thread_slot': [field & slot_mask for field in node_fields],
+            'sequence': [id_value & max_sequence for id_value in ids],
         }
 
     def get_config_info(self) -> str:
@@ -233,6 +670,13 @@ class TimeshardGenerator:
         max_timestamp = (1 << self.EPOCH_BITS) - 1
         years = (max_timestamp / 1000) / (365.25 * 24 * 60 * 60)
 
+        if self.thread_slot_bits:
+            slot_tradeoff = (
+                f"{self._slot_mask + 1:,}x fewer nodes; threads on separate slots never contend"
+            )
+        else:
+            slot_tradeoff = "disabled; all threads share one sequence"
+
         return f"""Timeshard Generator Configuration:
   Bit Allocation: {self.EPOCH_BITS}-{self.node_id_bits}-{self.sequence_bits} (total: {self.EPOCH_BITS + self.node_id_bits + self.sequence_bits})
 
@@ -242,105 +686,48 @@ class TimeshardGenerator:
     - Custom Epoch: {self.custom_epoch} ({self._format_epoch()})
 
   Node ID:
-    - Bits: {self.node_id_bits}
+    - Bits: {self.node_id_bits - self.thread_slot_bits}
     - Max Nodes: {self.max_node_id + 1:,}
     - Current Node: {self.node_id}
 
+  Thread Slots:
+    - Bits: {self.thread_slot_bits} (taken from the node ID bits)
+    - Slots per Node: {self._slot_mask + 1:,}
+    - Trade-off: {slot_tradeoff}
+
   Sequence:
     - Bits: {self.sequence_bits}
-    - IDs per ms: {self.max_sequence + 1:,}
-    - Throughput: {(self.max_node_id + 1) * (self.max_sequence + 1):,} IDs/ms globally
+    - IDs per ms: {self.max_sequence + 1:,} per slot
+    - Throughput: {(self._node_mask + 1) * (self.max_sequence + 1):,} IDs/ms globally
 """
 
+    def _assign_slot(self) -> _Slot:
+        """Assign the calling thread a slot on its first call, round-robin."""
+        # Slots keep their own lock, so threads sharing one (more threads than slots) stay safe
+        slot = self._slots[next(self._slot_counter) & self._slot_mask]
+        self._local.slot = slot
+        return slot
+
     def _timestamp(self) -> int:
         """Get current timestamp offset from custom epoch."""
-        return int(time.time() * 1000) - self.custom_epoch
+        return self._time_ns() // 1_000_000 - self.custom_epoch
 
     def _wait_next_millis(self, last_timestamp: int) -> int:
-        """Spin-wait until next millisecond."""
-        timestamp = self._timestamp()
-        while timestamp <= last_timestamp:
-            timestamp = self._timestamp()
-        return timestamp
-
-    def _get_node_id_bits_from_env(self) -> int:
-        """Get NODE_ID_BITS from environment variable."""
-        try:
-            node_id_bits = int(os.getenv('TIMESHARD_NODE_ID_BITS', '10'))
-        except ValueError:
-            raise RuntimeError(
-                "TIMESHARD_NODE_ID_BITS environment variable must be an integer"
-            )
-
-        if node_id_bits > 16:
-            raise RuntimeError(
-                f"TIMESHARD_NODE_ID_BITS must be <= 16, got {node_id_bits}"
-            )
-
-        if node_id_bits < 1:
-            raise RuntimeError(
-                f"TIMESHARD_NODE_ID_BITS must be >= 1, got {node_id_bits}"
-            )
-
-        return node_id_bits
-
-    def _get_node_id_from_env(self) -> Optional[int]:
-        """Get explicit node ID from environment variable."""
-        node_id_str = os.getenv('TIMESHARD_NODE_ID')
-        if node_id_str is None:
-            return None
-
-        try:
-            return int(node_id_str)
-        except ValueError:
-            raise RuntimeError(
-                f"TIMESHARD_NODE_ID environment variable must be an integer, got '{node_id_str}'"
-            )
-
-    def _get_custom_epoch_from_env(self) -> int:
-        """Get custom epoch from environment variable."""
-        epoch_str = os.getenv('TIMESHARD_CUSTOM_EPOCH')
-        if epoch_str is None:
-            return self.DEFAULT_CUSTOM_EPOCH
-
-        try:
-            return int(epoch_str)
-        except ValueError:
-            raise RuntimeError(
-                f"TIMESHARD_CUSTOM_EPOCH must be an integer, got '{epoch_str}'"
-            )
-
-    def _generate_node_id(self) -> int:
-        """
-        Auto-generate node ID from machine's IP address.
-
-        Uses last 2 octets of IP address to generate a semi-unique node ID.
-        This works well in Kubernetes/Docker environments where each pod gets a unique IP.
-
-        Returns:
-            Node ID derived from IP address
-        """
-        try:
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
-            octets = [int(x) for x in ip_address.split('.')]
-
-            # Combine last 2 octets: 192.168.1.42 -> (1 << 8) | 42 = 298
-            ip_bits = (octets[2] << 8) | octets[3]
-
-            # Mask to fit in node_id_bits
-            node_id = ip_bits & self.max_node_id
-
-            return node_id
-        except Exception as e:
-            # Fallback to 0 if IP detection fails
-            import warnings
-            warnings.warn(
-                f"Failed to auto-generate node ID from IP: {e}. Using node_id=0. "
-                f"Consider setting TIMESHARD_NODE_ID environment variable.",
-                RuntimeWarning
-            )
-            return 0
+        """Sleep until next millisecond instead of spinning on the clock."""
+        monotonic_ns = time.monotonic_ns
+        target_ns = (last_timestamp + 1 + self.custom_epoch) * 1_000_000
+        now_ns = self._time_ns()
+        while now_ns < target_ns:
+            # Poll the monotonic clock while waiting; wall time is re-read only
+            # once the deadline passes (it is what the ID is built from)
+            remaining_ns = target_ns - now_ns
+            deadline_ns = monotonic_ns() + remaining_ns
+            while remaining_ns > 0:
+                # Sleep half the remaining time so we don't oversleep past the target ms
+                time.sleep(remaining_ns * 0.5e-9)
+                remaining_ns = deadline_ns - monotonic_ns()
+            now_ns = self._time_ns()
+        return now_ns // 1_000_000 - self.custom_epoch
 
     def _format_epoch(self) -> str:
         """Format custom epoch as human-readable date."""
@@ -355,5 +742,6 @@ class TimeshardGenerator:
             f"node_id_bits={self.node_id_bits}, "
             f"sequence_bits={self.sequence_bits}, "
             f"custom_epoch={self.custom_epoch}, "
-            f"node_id={self.node_id})"
+            f"node_id={self.node_id}, "
+            f"thread_slot_bits={self.thread_slot_bits})"
         )
\ No newline at end of file